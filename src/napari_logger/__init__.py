@@ -2,5 +2,6 @@ __version__ = "0.0.1"
 
 from ._magicgui_logger import Logger
 from ._main import NapariLogger
+from ._store import LogStore
 
-__all__ = ["NapariLogger", "Logger"]
+__all__ = ["NapariLogger", "Logger", "LogStore"]
@@ -1,8 +1,8 @@
 from __future__ import annotations
 
+import heapq
 import logging
-import sys
-from contextlib import contextmanager
+from contextlib import asynccontextmanager, contextmanager
 from pathlib import Path
 from typing import TYPE_CHECKING, Any
 
@@ -11,7 +11,8 @@ from magicgui.widgets import Widget
 from qtpy import QtGui
 from qtpy.QtCore import Qt
 
-from napari_logger._qt_logger import QtLogger
+from napari_logger._qt_logger import Output, QtLogger
+from napari_logger._store import Channel, Entry, LogStore
 from napari_logger._utils import rst_to_html
 
 if TYPE_CHECKING:
@@ -80,11 +81,22 @@ class Logger(Widget, logging.Handler):
     >>> with logger.set_plt():
     >>>     plt.plot(np.random.random(100))
 
+    Logging from asyncio tasks
+
+    >>> async def task():
+    ...     await logger.aprint("text")
+    ...     # print things of this task (and tasks created in it) only
+    ...     async with logger.acapture():
+    ...         print("text")
+
+    All the loggers are views of a process-wide ``LogStore``. Printed texts
+    and log records are ingested only once by the store, and hidden loggers
+    catch up with the store when they are shown again.
     """
 
     current_logger: Logger | None = None
 
-    def __init__(self):
+    def __init__(self, store: LogStore | None = None):
         logging.Handler.__init__(self)
         Widget.__init__(
             self, widget_type=QBaseWidget, backend_kwargs={"qwidg": QtLogger}
@@ -95,6 +107,19 @@ class Logger(Widget, logging.Handler):
         self._logger_name = None
         self._print_as_html = False
 
+        if store is None:
+            store = LogStore.instance()
+        self._store = store
+        # (channel, name) -> list of [start, stop, as_html]
+        self._windows: dict[tuple[int, str | None], list[list]] = {}
+        self._rendered_seq = store.seq
+        self.native.visibilityChanged.connect(self._on_visibility_changed)
+
+    @property
+    def store(self) -> LogStore:
+        """The record store this logger is a view of."""
+        return self._store
+
     def emit(self, record):
         """Handle the logging event."""
         msg = self.format(record)
@@ -103,21 +128,44 @@ class Logger(Widget, logging.Handler):
 
     def clear(self):
         """Clear all the histories."""
-        self.native.clear()
+        self._store.ingest_pending()
+        with self._store.lock:
+            self._rendered_seq = self._store.seq
+            self._store.pop_direct(self)
+            self.native.clear()
         return None
 
     @property
     def value(self):
+        self._store.ingest_pending()
+        self._catch_up()
         return self.native.toPlainText()
 
     def print(self, *msg, sep=" ", end="\n"):
         """Print things in the end of the logger widget."""
-        self.native.appendText(sep.join(map(str, msg)) + end)
+        self._store.post(self, (Output.TEXT, sep.join(map(str, msg)) + end))
         return None
 
     def print_html(self, html: str, end="<br></br>"):
         """Print things in the end of the logger widget using HTML string."""
-        self.native.appendHtml(html + end)
+        self._store.post(self, (Output.HTML, html + end))
+        return None
+
+    async def aprint(self, *msg, sep=" ", end="\n"):
+        """
+        Print things in the end of the logger widget from a coroutine.
+
+        Outputs printed during one iteration of the event loop are displayed
+        at once. If too many outputs are waiting to be displayed, this method
+        waits until they are.
+        """
+        output = (Output.TEXT, sep.join(map(str, msg)) + end)
+        await self._store.apost(self, output)
+        return None
+
+    async def aprint_html(self, html: str, end="<br></br>"):
+        """Print HTML string in the end of the widget from a coroutine."""
+        await self._store.apost(self, (Output.HTML, html + end))
         return None
 
     def print_rst(self, rst: str, end="\n"):
@@ -125,7 +173,7 @@ class Logger(Widget, logging.Handler):
         html = rst_to_html(rst, unescape=False)
         if end == "\n":
             end = "<br></br>"
-        self.native.appendHtml(html + end)
+        self._store.post(self, (Output.HTML, html + end))
         return None
 
     def print_table(
@@ -156,9 +204,8 @@ class Logger(Widget, logging.Handler):
             formatter = None
         else:
             formatter = lambda x: f"{x:.{precision}f}"  # noqa: E731
-        self.native.appendHtml(
-            df.to_html(header=header, index=index, float_format=formatter)
-        )
+        html = df.to_html(header=header, index=index, float_format=formatter)
+        self._store.post(self, (Output.HTML, html))
         return None
 
     def print_image(
@@ -204,7 +251,7 @@ class Logger(Widget, logging.Handler):
                 width, Qt.TransformationMode.SmoothTransformation
             )
 
-        self.native.appendImage(image)
+        self._store.post(self, (Output.IMAGE, image))
         return None
 
     def print_figure(self, fig: mpl_Figure) -> None:
@@ -223,16 +270,28 @@ class Logger(Widget, logging.Handler):
 
     @print_as_html.setter
     def print_as_html(self, val: bool):
-        self._print_as_html = bool(val)
+        val = bool(val)
+        self._store.ingest_pending()
+        with self._store.lock:
+            if self._stdout and val != self._print_as_html:
+                # texts printed from now on are rendered in the new mode
+                seq = self._store.seq
+                windows = self._windows[(Channel.STDOUT, None)]
+                windows[-1][1] = seq
+                self._prune_windows(windows)
+                windows.append([seq, None, val])
+            self._print_as_html = val
 
     def write(self, msg: str) -> None:
         """Handle the print event."""
-        if self._print_as_html:
-            self.print_html(msg)
-        else:
-            self.print(msg, end="")
+        self._store.post(self, self._stdout_output(msg))
         return None
 
+    def _stdout_output(self, msg: str) -> tuple[int, str]:
+        if self._print_as_html:
+            return (Output.HTML, msg + "<br></br>")
+        return (Output.TEXT, msg)
+
     def flush(self):
         """Do nothing."""
 
@@ -248,10 +307,13 @@ class Logger(Widget, logging.Handler):
 
     @stdout.setter
     def stdout(self, val: bool):
+        val = bool(val)
+        if val == self._stdout:
+            return
         if val:
-            sys.stdout = self
+            self._open_window(Channel.STDOUT)
         else:
-            sys.stdout = sys.__stdout__
+            self._close_window(Channel.STDOUT)
         self._stdout = val
 
     @contextmanager
@@ -264,16 +326,30 @@ class Logger(Widget, logging.Handler):
         finally:
             self.stdout = was_true
 
+    @asynccontextmanager
+    async def acapture(self):
+        """
+        An async context manager for printing things in this widget.
+
+        Unlike ``set_stdout``, only the things printed in the current task
+        (and the tasks created in it) are captured.
+        """
+        with self._store.capture(self):
+            yield self
+
     @property
     def logging(self):
         return self._logging
 
     @logging.setter
     def logging(self, val: bool):
+        val = bool(val)
+        if val == self._logging:
+            return
         if val:
-            logging.getLogger(self._logger_name).addHandler(self)
+            self._open_window(Channel.LOGGING, self._logger_name)
         else:
-            logging.getLogger(self._logger_name).removeHandler(self)
+            self._close_window(Channel.LOGGING, self._logger_name)
         self._logging = val
 
     @contextmanager
@@ -321,6 +397,108 @@ class Logger(Widget, logging.Handler):
             mpl.use(backend)
         return None
 
+    def _open_window(self, channel: int, name: str | None = None) -> None:
+        """Start displaying records of the channel."""
+        with self._store.lock:
+            seq = self._store.subscribe(self, channel, name)
+            windows = self._windows.setdefault((channel, name), [])
+            self._prune_windows(windows)
+            windows.append([seq, None, self._print_as_html])
+        return None
+
+    def _close_window(self, channel: int, name: str | None = None) -> None:
+        """Stop displaying records of the channel."""
+        with self._store.lock:
+            seq = self._store.unsubscribe(self, channel, name)
+            windows = self._windows.get((channel, name))
+            if windows and windows[-1][1] is None:
+                windows[-1][1] = seq
+        return None
+
+    def _prune_windows(self, windows: list[list]) -> None:
+        """Drop the closed windows that no longer contain records to render."""
+        done = max(self._rendered_seq, self._store.oldest_seq - 1)
+        windows[:] = [
+            window
+            for window in windows
+            if window[1] is None or window[0] < window[1] and window[1] > done
+        ]
+        return None
+
+    def _find_window(self, entry: Entry) -> list | None:
+        windows = self._windows.get((entry.channel, entry.name), [])
+        for window in reversed(windows):
+            start, stop, _ = window
+            if stop is not None and stop < entry.seq:
+                break
+            if start < entry.seq:
+                return window
+        return None
+
+    def _output_for(self, entry: Entry) -> tuple[int, Any] | None:
+        """Convert an entry into the output of this view, if displayed."""
+        if entry.channel == Channel.DIRECT:
+            if entry.target() is self:
+                return entry.obj
+            return None
+        window = self._find_window(entry)
+        if window is None:
+            return None
+        if entry.channel == Channel.STDOUT:
+            if window[2]:
+                return (Output.HTML, entry.obj + "<br></br>")
+            return (Output.TEXT, entry.obj)
+        record: logging.LogRecord = entry.obj
+        if record.levelno < self.level or not self.filter(record):
+            return None
+        return (Output.TEXT, entry.format(self) + "\n")
+
+    def _render_entries(self, entries: list[Entry]) -> None:
+        """Render entries just ingested by the store."""
+        self._rendered_seq = entries[-1].seq
+        outputs: list[tuple[int, Any]] = []
+        for entry in entries:
+            output = self._output_for(entry)
+            if output is not None:
+                outputs.append(output)
+        if len(outputs) == 1:
+            self.native.process.emit(outputs[0])
+        elif outputs:
+            self.native.appendBatch(outputs)
+        return None
+
+    def _catch_up(self) -> None:
+        """Render the entries ingested while this view was inactive."""
+        with self._store.lock:
+            merged = heapq.merge(
+                self._store.entries_since(self._rendered_seq),
+                self._store.pop_direct(self),
+                key=lambda entry: entry.seq,
+            )
+            entries = [e for e in merged if e.seq > self._rendered_seq]
+            self._rendered_seq = self._store.seq
+            # older outputs will be dropped from the history anyway
+            outputs: list[tuple[int, Any]] = []
+            for entry in reversed(entries):
+                output = self._output_for(entry)
+                if output is not None:
+                    outputs.append(output)
+                    if len(outputs) >= self.native._max_history:
+                        break
+            if outputs:
+                outputs.reverse()
+                self.native.appendBatch(outputs)
+        return None
+
+    def _on_visibility_changed(self, visible: bool) -> None:
+        if visible:
+            with self._store.lock:
+                self._catch_up()
+                self._store.activate(self)
+        else:
+            self._store.deactivate(self)
+        return None
+
     def _get_proper_plt_style(self) -> dict[str, Any]:
         import matplotlib.pyplot as plt
 
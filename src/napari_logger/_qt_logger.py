@@ -22,6 +22,8 @@ Printable = Union[str, QtGui.QImage]
 
 class QtLogger(QtW.QTextEdit):
     process = Signal(tuple)
+    processBatch = Signal(list)
+    visibilityChanged = Signal(bool)
 
     def __init__(self, parent=None, max_history: int = 500):
         super().__init__(parent=parent)
@@ -30,6 +32,7 @@ class QtLogger(QtW.QTextEdit):
         self._max_history = int(max_history)
         self._n_lines = 0
         self.process.connect(self.update)
+        self.processBatch.connect(self.update_batch)
 
         self.setContextMenuPolicy(Qt.ContextMenuPolicy.CustomContextMenu)
 
@@ -64,6 +67,26 @@ class QtLogger(QtW.QTextEdit):
             self._post_append()
         return None
 
+    def update_batch(self, outputs: list[tuple[int, Printable]]):
+        with suppress(RuntimeError):
+            self.setUpdatesEnabled(False)
+            try:
+                for output_type, obj, count in _merge_outputs(outputs):
+                    self.update((output_type, obj))
+                    for _ in range(count - 1):
+                        self._post_append()
+            finally:
+                self.setUpdatesEnabled(True)
+        return None
+
+    def showEvent(self, event: QtGui.QShowEvent):
+        super().showEvent(event)
+        self.visibilityChanged.emit(True)
+
+    def hideEvent(self, event: QtGui.QHideEvent):
+        super().hideEvent(event)
+        self.visibilityChanged.emit(False)
+
     def appendText(self, text: str):
         """Append text in the main thread."""
         self.process.emit((Output.TEXT, text))
@@ -76,6 +99,10 @@ class QtLogger(QtW.QTextEdit):
         """Append image in the main thread."""
         self.process.emit((Output.IMAGE, qimage))
 
+    def appendBatch(self, outputs: list[tuple[int, Printable]]):
+        """Append many outputs in the main thread at once."""
+        self.processBatch.emit(outputs)
+
     def _post_append(self):
         """Check the history length."""
         if self._n_lines < self._max_history:
@@ -135,3 +162,18 @@ class QtLogger(QtW.QTextEdit):
             QtGui.QTextDocument.ResourceType.ImageResource, QtCore.QUrl(name)
         )
         return image
+
+
+def _merge_outputs(
+    outputs: list[tuple[int, Printable]]
+) -> list[tuple[int, Printable, int]]:
+    """Concatenate successive texts (or HTMLs) into one output."""
+    merged: list[tuple[int, Printable, int]] = []
+    for output_type, obj in outputs:
+        if output_type != Output.IMAGE and merged:
+            last_type, last_obj, count = merged[-1]
+            if last_type == output_type:
+                merged[-1] = (output_type, last_obj + obj, count + 1)
+                continue
+        merged.append((output_type, obj, 1))
+    return merged
@@ -0,0 +1,437 @@
+from __future__ import annotations
+
+import asyncio
+import copy
+import logging
+import sys
+import threading
+import traceback
+import weakref
+from collections import deque
+from contextlib import contextmanager
+from contextvars import ContextVar
+from typing import TYPE_CHECKING, Any, Hashable
+
+if TYPE_CHECKING:
+    from napari_logger._magicgui_logger import Logger
+
+# renders the tracebacks of the stored log records
+_FORMATTER = logging.Formatter()
+
+# The logger that captures the standard output of the current context.
+_capture_target: ContextVar[Logger | None] = ContextVar(
+    "napari_logger_capture_target", default=None
+)
+
+
+class Channel:
+    """Sources a record can come from."""
+
+    DIRECT = 0
+    STDOUT = 1
+    LOGGING = 2
+
+
+class Entry:
+    """A record ingested by the store, shared by all the views."""
+
+    __slots__ = ("seq", "channel", "name", "obj", "target", "_formatted")
+
+    def __init__(
+        self,
+        seq: int,
+        channel: int,
+        obj: Any,
+        name: str | None = None,
+        target: weakref.ref | None = None,
+    ):
+        self.seq = seq
+        self.channel = channel
+        self.obj = obj
+        self.name = name
+        self.target = target
+        self._formatted: dict[Any, str] | None = None
+
+    def format(self, handler: logging.Handler) -> str:
+        """Format the log record, only once per formatter."""
+        key = handler.formatter
+        if self._formatted is None:
+            self._formatted = {}
+        try:
+            return self._formatted[key]
+        except KeyError:
+            text = self._formatted[key] = handler.format(self.obj)
+            return text
+
+
+class _LoggingChannel(logging.Handler):
+    """The handler attached to a logger on behalf of all the views."""
+
+    def __init__(self, store: LogStore, name: str | None):
+        super().__init__()
+        self._store = store
+        self._name = name
+
+    def emit(self, record: logging.LogRecord):
+        self._store._ingest_soon(
+            Channel.LOGGING, self.prepare(record), name=self._name
+        )
+        return None
+
+    def prepare(self, record: logging.LogRecord) -> logging.LogRecord:
+        """
+        Freeze the record before storing it.
+
+        Records are formatted later by each view, so arguments are merged
+        into the message and the traceback is rendered now, like
+        ``logging.handlers.QueueHandler.prepare``.
+        """
+        # the record is still passed to the other handlers
+        record = copy.copy(record)
+        record.msg = record.message = record.getMessage()
+        record.args = None
+        if record.exc_info:
+            if not record.exc_text:
+                record.exc_text = _FORMATTER.formatException(record.exc_info)
+            record.exc_info = None
+        return record
+
+
+class _Batcher:
+    """
+    Buffer records posted during one iteration of an event loop.
+
+    Buffered records are ingested at once in the next iteration, so that each
+    view is updated only once per iteration. Coroutines posting records wait
+    while the buffer is full.
+    """
+
+    def __init__(
+        self, store: LogStore, loop: asyncio.AbstractEventLoop, maxsize: int
+    ):
+        self._store = store
+        # the batcher is a value of a WeakKeyDictionary keyed by the loop
+        self._loop_ref = weakref.ref(loop)
+        self._maxsize = maxsize
+        self._buffer: list[tuple] = []
+        self._handle: asyncio.Handle | None = None
+        self._drained: asyncio.Future | None = None
+
+    def put_nowait(self, item: tuple) -> None:
+        """Buffer a record regardless of the buffer size."""
+        self._buffer.append(item)
+        if self._handle is None:
+            self._handle = self._loop_ref().call_soon(self.flush)
+        return None
+
+    async def put(self, item: tuple) -> None:
+        """Buffer a record, waiting for the buffer to be flushed if full."""
+        while len(self._buffer) >= self._maxsize:
+            if self._drained is None:
+                self._drained = self._loop_ref().create_future()
+            # shield the shared future from cancellation of this waiter
+            await asyncio.shield(self._drained)
+        self.put_nowait(item)
+        return None
+
+    def flush(self) -> None:
+        """Ingest all the buffered records."""
+        if self._handle is not None:
+            self._handle.cancel()
+            self._handle = None
+        buffer, self._buffer = self._buffer, []
+        try:
+            if buffer:
+                self._store._ingest_many(buffer)
+        finally:
+            # never leave the waiting coroutines blocked
+            if self._drained is not None:
+                if not self._drained.done():
+                    self._drained.set_result(None)
+                self._drained = None
+        return None
+
+
+class LogStore:
+    """
+    A process-wide store of records that fans out to logger views.
+
+    Each record is ingested once. Only the active (visible) views render it
+    immediately, the others catch up from the store when they are shown.
+
+    Parameters
+    ----------
+    capacity : int, default is 10000
+        Number of records kept for views to catch up.
+    direct_capacity : int, default is 500
+        Number of outputs posted to a specific inactive view (texts printed by
+        ``Logger.print``, images etc.) kept for the view to catch up.
+    buffer_size : int, default is 1024
+        Number of records buffered during one iteration of an asyncio event
+        loop before coroutines posting records start to wait.
+    """
+
+    _instance: LogStore | None = None
+
+    def __init__(
+        self,
+        capacity: int = 10000,
+        direct_capacity: int = 500,
+        buffer_size: int = 1024,
+    ):
+        self._entries: deque[Entry] = deque(maxlen=int(capacity))
+        # outputs posted to inactive views are not shared with other views
+        self._direct: weakref.WeakKeyDictionary[
+            Logger, deque[Entry]
+        ] = weakref.WeakKeyDictionary()
+        self._direct_capacity = int(direct_capacity)
+        self._seq = 0
+        self._lock = threading.RLock()
+        self._active: weakref.WeakSet[Logger] = weakref.WeakSet()
+        # (channel, name) -> {id(view): finalizer releasing the channel}
+        self._subscribers: dict[Hashable, dict[int, weakref.finalize]] = {}
+        self._connected: set[Hashable] = set()
+        self._handlers: dict[str | None, _LoggingChannel] = {}
+        self._orig_stdout = None
+        self._stdout_users = 0
+        self._buffer_size = int(buffer_size)
+        self._batchers: weakref.WeakKeyDictionary[
+            asyncio.AbstractEventLoop, _Batcher
+        ] = weakref.WeakKeyDictionary()
+
+    @classmethod
+    def instance(cls) -> LogStore:
+        """Return the process-wide store."""
+        if cls._instance is None:
+            cls._instance = cls()
+        return cls._instance
+
+    @property
+    def seq(self) -> int:
+        """Sequence number of the last ingested record."""
+        return self._seq
+
+    @property
+    def oldest_seq(self) -> int:
+        """Sequence number of the oldest record kept for views to catch up."""
+        with self._lock:
+            if self._entries:
+                return self._entries[0].seq
+            return self._seq + 1
+
+    @property
+    def lock(self) -> threading.RLock:
+        return self._lock
+
+    def post(self, view: Logger, output: tuple[int, Any]) -> None:
+        """Post an output that is only displayed in the given view."""
+        self._ingest_soon(Channel.DIRECT, output, target=weakref.ref(view))
+        return None
+
+    async def apost(self, view: Logger, output: tuple[int, Any]) -> None:
+        """Post an output, waiting if the buffer of the event loop is full."""
+        item = (Channel.DIRECT, output, None, weakref.ref(view))
+        await self._get_batcher().put(item)
+        return None
+
+    def write(self, msg: str) -> None:
+        """Handle the print event."""
+        view = _capture_target.get()
+        if view is not None:
+            output = view._stdout_output(msg)
+            self._ingest_soon(Channel.DIRECT, output, target=weakref.ref(view))
+        elif self._subscribers.get((Channel.STDOUT, None)):
+            self._ingest_soon(Channel.STDOUT, msg)
+        elif self._orig_stdout is not None:
+            # printed outside any capture context
+            self._orig_stdout.write(msg)
+        return None
+
+    def flush(self):
+        """Do nothing."""
+
+    def ingest_pending(self) -> None:
+        """Ingest the records buffered in the running event loop, if any."""
+        try:
+            loop = asyncio.get_running_loop()
+        except RuntimeError:
+            return None
+        batcher = self._batchers.get(loop)
+        if batcher is not None:
+            batcher.flush()
+        return None
+
+    @contextmanager
+    def capture(self, view: Logger):
+        """
+        A context manager for printing things in the view.
+
+        Unlike the stdout channel, the capture is scoped to the current
+        context, such as an asyncio task and the tasks created in it.
+        """
+        token = _capture_target.set(view)
+        self._acquire_stdout()
+        try:
+            yield view
+        finally:
+            self._release_stdout()
+            _capture_target.reset(token)
+
+    def entries_since(self, seq: int) -> list[Entry]:
+        """Return all the stored entries after the given sequence number."""
+        with self._lock:
+            # sequence numbers of the stored entries are not contiguous
+            # because direct outputs are not stored here
+            entries: list[Entry] = []
+            for entry in reversed(self._entries):
+                if entry.seq <= seq:
+                    break
+                entries.append(entry)
+            entries.reverse()
+            return entries
+
+    def pop_direct(self, view: Logger) -> list[Entry]:
+        """Return and forget the outputs posted to the inactive view."""
+        with self._lock:
+            return list(self._direct.pop(view, ()))
+
+    def activate(self, view: Logger) -> None:
+        """Render new records in the view as soon as they are ingested."""
+        with self._lock:
+            self._active.add(view)
+        return None
+
+    def deactivate(self, view: Logger) -> None:
+        """Stop rendering new records in the view."""
+        with self._lock:
+            self._active.discard(view)
+        return None
+
+    def subscribe(self, view: Logger, channel: int, name=None) -> int:
+        """
+        Subscribe a view to a channel.
+
+        The first subscription to the stdout channel redirects ``sys.stdout``
+        to the store, and the first subscription to a logger adds a handler
+        to it. Returns the current sequence number.
+        """
+        # records printed before subscribing must be numbered before it
+        self.ingest_pending()
+        with self._lock:
+            key = (channel, name)
+            views = self._subscribers.setdefault(key, {})
+            if id(view) not in views:
+                self._connect(channel, name)
+                # release the channel even if the view is never unsubscribed
+                views[id(view)] = weakref.finalize(
+                    view, self._release, key, id(view)
+                )
+            return self._seq
+
+    def unsubscribe(self, view: Logger, channel: int, name=None) -> int:
+        """Unsubscribe a view from a channel and return the sequence number."""
+        self.ingest_pending()
+        with self._lock:
+            views = self._subscribers.get((channel, name), {})
+            finalizer = views.get(id(view))
+            if finalizer is not None:
+                finalizer()
+            return self._seq
+
+    def _release(self, key: tuple[int, str | None], view_id: int) -> None:
+        with self._lock:
+            views = self._subscribers.get(key)
+            if views is None or views.pop(view_id, None) is None:
+                return None
+            if not views:
+                self._disconnect(*key)
+        return None
+
+    def _acquire_stdout(self) -> None:
+        with self._lock:
+            if self._stdout_users == 0:
+                self._orig_stdout = sys.stdout
+                sys.stdout = self
+            self._stdout_users += 1
+        return None
+
+    def _release_stdout(self) -> None:
+        with self._lock:
+            self._stdout_users -= 1
+            if self._stdout_users == 0:
+                if sys.stdout is self:
+                    sys.stdout = self._orig_stdout or sys.__stdout__
+                self._orig_stdout = None
+        return None
+
+    def _connect(self, channel: int, name) -> None:
+        if (channel, name) in self._connected:
+            return None
+        self._connected.add((channel, name))
+        if channel == Channel.STDOUT:
+            self._acquire_stdout()
+        elif channel == Channel.LOGGING:
+            handler = self._handlers[name] = _LoggingChannel(self, name)
+            logging.getLogger(name).addHandler(handler)
+        return None
+
+    def _disconnect(self, channel: int, name) -> None:
+        if (channel, name) not in self._connected:
+            return None
+        self._connected.discard((channel, name))
+        if channel == Channel.STDOUT:
+            self._release_stdout()
+        elif channel == Channel.LOGGING:
+            handler = self._handlers.pop(name)
+            logging.getLogger(name).removeHandler(handler)
+        return None
+
+    def _get_batcher(self) -> _Batcher:
+        loop = asyncio.get_running_loop()
+        with self._lock:
+            batcher = self._batchers.get(loop)
+            if batcher is None:
+                batcher = _Batcher(self, loop, self._buffer_size)
+                self._batchers[loop] = batcher
+        return batcher
+
+    def _ingest_soon(self, channel: int, obj, name=None, target=None) -> None:
+        """Ingest a record in the next iteration of the running event loop."""
+        try:
+            batcher = self._get_batcher()
+        except RuntimeError:
+            return self._ingest(channel, obj, name=name, target=target)
+        batcher.put_nowait((channel, obj, name, target))
+        return None
+
+    def _ingest(self, channel: int, obj, name=None, target=None) -> None:
+        return self._ingest_many([(channel, obj, name, target)])
+
+    def _ingest_many(self, items: list[tuple]) -> None:
+        with self._lock:
+            entries: list[Entry] = []
+            for channel, obj, name, target in items:
+                self._seq += 1
+                entry = Entry(
+                    self._seq, channel, obj, name=name, target=target
+                )
+                entries.append(entry)
+                if channel != Channel.DIRECT:
+                    self._entries.append(entry)
+                    continue
+                view = target()
+                if view is not None and view not in self._active:
+                    direct = self._direct.get(view)
+                    if direct is None:
+                        direct = deque(maxlen=self._direct_capacity)
+                        self._direct[view] = direct
+                    direct.append(entry)
+            for view in list(self._active):
+                try:
+                    view._render_entries(entries)
+                except Exception:
+                    # a broken view should not stop the others, like
+                    # logging.Handler.handleError
+                    if logging.raiseExceptions and sys.stderr:
+                        traceback.print_exc(file=sys.stderr)
+        return None
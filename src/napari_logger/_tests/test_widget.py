@@ -1,6 +1,19 @@
+import gc
+
 import napari
+import pytest
+
+from napari_logger import Logger, LogStore, NapariLogger
+
 
-from napari_logger import NapariLogger
+@pytest.fixture(autouse=True)
+def fresh_store():
+    """Do not share the process-wide store between tests."""
+    LogStore._instance = None
+    yield
+    LogStore._instance = None
+    # release the channels subscribed by the widgets of the test
+    gc.collect()
 
 
 def test_launch(make_napari_viewer):
@@ -52,3 +65,165 @@ def test_matplotlib():
 
     plt.plot([0, 1, 2])
     plt.show()
+
+
+def test_logging_frozen():
+    import logging
+
+    logger = logging.getLogger(__name__)
+    naplogger = NapariLogger()
+    naplogger.checkboxes.logging.value = True
+    state = ["original"]
+    logger.warning("state=%s", state)
+    state[0] = "mutated"
+    try:
+        raise ValueError("error")
+    except ValueError:
+        logger.exception("failed")
+    naplogger.checkboxes.logging.value = False
+
+    lines = naplogger.logger.value.splitlines()
+    assert lines[0] == "state=['original']"
+    assert lines[1] == "failed"
+    assert lines[-1] == "ValueError: error"
+
+
+def test_multiple_views():
+    naplogger0 = NapariLogger()
+    naplogger1 = NapariLogger()
+    naplogger0.checkboxes.printing.value = True
+    print(0)
+    naplogger1.checkboxes.printing.value = True
+    print(1)
+    naplogger0.checkboxes.printing.value = False
+    print(2)
+    naplogger1.checkboxes.printing.value = False
+    assert naplogger0.logger.value == "0\n1\n"
+    assert naplogger1.logger.value == "1\n2\n"
+
+
+def test_view_filter():
+    import logging
+
+    logger = logging.getLogger(__name__)
+    naplogger0 = NapariLogger()
+    naplogger1 = NapariLogger()
+    naplogger1.logger.setLevel(logging.ERROR)
+    naplogger0.checkboxes.logging.value = True
+    naplogger1.checkboxes.logging.value = True
+    logger.warning("0")
+    logger.error("1")
+    naplogger0.checkboxes.logging.value = False
+    naplogger1.checkboxes.logging.value = False
+    assert naplogger0.logger.value == "0\n1\n"
+    assert naplogger1.logger.value == "1\n"
+
+
+def test_direct_print():
+    naplogger0 = NapariLogger()
+    naplogger1 = NapariLogger()
+    naplogger0.logger.print("0")
+    assert naplogger0.logger.value == "0\n"
+    assert naplogger1.logger.value == ""
+
+
+def test_catch_up_after_direct_print():
+    naplogger = NapariLogger()
+    naplogger.checkboxes.printing.value = True
+    print(0)
+    naplogger.logger.print(1)
+    print(2)
+    assert naplogger.logger.value == "0\n1\n2\n"
+    print(3)
+    naplogger.checkboxes.printing.value = False
+    assert naplogger.logger.value == "0\n1\n2\n3\n"
+
+
+def test_windows_pruned():
+    logger = Logger(store=LogStore())
+    for i in range(10):
+        with logger.set_stdout():
+            print(i)
+        assert logger.value.endswith(f"{i}\n")
+    assert sum(len(windows) for windows in logger._windows.values()) == 1
+
+
+def test_live_rendering():
+    store = LogStore()
+    shown = Logger(store=store)
+    hidden = Logger(store=store)
+    shown.native.show()
+    shown.stdout = True
+    hidden.stdout = True
+    print(0)
+    assert shown.native.toPlainText() == "0\n"
+    assert hidden.native.toPlainText() == ""
+
+    hidden.native.show()
+    assert hidden.native.toPlainText() == "0\n"
+    shown.native.hide()
+    print(1)
+    shown.stdout = False
+    hidden.stdout = False
+    assert hidden.native.toPlainText() == "0\n1\n"
+    assert shown.native.toPlainText() == "0\n"
+    assert shown.value == "0\n1\n"
+    hidden.native.hide()
+
+
+def test_aprint():
+    import asyncio
+
+    logger = Logger(store=LogStore(buffer_size=2))
+
+    async def main():
+        tasks = [asyncio.ensure_future(logger.aprint(i)) for i in range(3)]
+        await asyncio.sleep(0)
+        # the third one waits until the full buffer is flushed
+        assert tasks[0].done() and tasks[1].done()
+        assert not tasks[2].done()
+        await asyncio.gather(*tasks)
+        await asyncio.gather(*[logger.aprint(i) for i in range(3, 10)])
+        return logger.value
+
+    assert asyncio.run(main()) == "".join(f"{i}\n" for i in range(10))
+
+
+def test_batched_update():
+    import asyncio
+
+    logger = Logger(store=LogStore())
+    logger.native.show()
+    batches = []
+    logger.native.processBatch.connect(batches.append)
+
+    async def main():
+        await asyncio.gather(*[logger.aprint(i) for i in range(5)])
+        await asyncio.sleep(0)
+        return logger.native.toPlainText()
+
+    # printed in one iteration of the loop and displayed at once
+    assert asyncio.run(main()) == "0\n1\n2\n3\n4\n"
+    assert len(batches) == 1
+    assert len(batches[0]) == 5
+    logger.native.hide()
+
+
+def test_acapture():
+    import asyncio
+
+    naplogger0 = NapariLogger()
+    naplogger1 = NapariLogger()
+
+    async def task(logger, i):
+        async with logger.acapture():
+            await asyncio.sleep(0)
+            print(i)
+
+    async def main():
+        await asyncio.gather(
+            task(naplogger0.logger, 0), task(naplogger1.logger, 1)
+        )
+        return naplogger0.logger.value, naplogger1.logger.value
+
+    assert asyncio.run(main()) == ("0\n", "1\n")